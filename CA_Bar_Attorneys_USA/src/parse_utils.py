@@ -0,0 +1,195 @@
+"""
+Offline US address / ZIP normaliser for lead records.
+
+The ZIP -> city/state/county/centroid table ships in data/zip_index/ as .npy arrays
+sorted by ZIP (memory-mapped on load) plus a JSON vocabulary, so a whole column is
+resolved with one np.searchsorted and nothing touches the network.
+
+The bundled index was compiled from the MIT-licensed `zipcodes` package data
+(zips.json.bz2, 42.7k ZIPs). To refresh it from a newer copy:
+
+    python src/parse_utils.py build path/to/zips.json.bz2
+"""
+
+import bz2
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ZIP_INDEX_DIR = Path(__file__).resolve().parents[1] / "data" / "zip_index"
+
+# "Firm, 123 Main St, Los Angeles, CA 90001-1234" (country suffix optional)
+ADDRESS_RE = (
+    r"^\s*(?P<head>.*?)[\s,]+(?P<state>[A-Za-z]{2})\.?\s+"
+    r"(?P<zip>\d{5})(?:-(?P<zip4>\d{4}))?"
+    r"(?:\s*,?\s*(?:USA|U\.S\.A\.|US|United States))?\s*$"
+)
+_NON_ALPHA = re.compile(r"[^A-Z ]+")
+_UNIT = re.compile(r"^(?:#|(?:ste|suite|unit|apt|fl|floor|rm|room|bldg|building)\b)", re.I)
+
+
+@lru_cache(maxsize=65536)
+def norm_city(s: str) -> str:
+    """'St. Louis ' -> 'ST LOUIS' (comparison key only, never written out)."""
+    return " ".join(_NON_ALPHA.sub("", s.upper()).split())
+
+
+# ---------- INDEX ----------
+def build_zip_index(src: Path, out_dir: Path = ZIP_INDEX_DIR) -> int:
+    """Compile a zipcodes-style zips.json(.bz2) into the memory-mappable index; returns #ZIPs."""
+    opener = bz2.open if str(src).endswith(".bz2") else open
+    with opener(src, "rt", encoding="utf-8") as f:
+        df = pd.DataFrame(json.load(f))
+    df = df[df["zip_code"].str.fullmatch(r"\d{5}")].drop_duplicates("zip_code").sort_values("zip_code")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    vocab = {}
+    for col, dtype in (("city", np.uint16), ("state", np.uint8), ("county", np.uint16)):
+        codes, uniques = pd.factorize(df[col])
+        assert len(uniques) < np.iinfo(dtype).max, f"too many {col} values for {dtype}"
+        np.save(out_dir / f"{col}_id.npy", codes.astype(dtype))
+        vocab[col] = uniques.tolist()
+    np.save(out_dir / "zip.npy", df["zip_code"].astype(np.int32).to_numpy())
+    np.save(out_dir / "lat.npy", pd.to_numeric(df["lat"], errors="coerce").to_numpy(np.float32))
+    np.save(out_dir / "lon.npy", pd.to_numeric(df["long"], errors="coerce").to_numpy(np.float32))
+    # other city names USPS accepts for a ZIP ("Hollywood" for 90028 -> Los Angeles)
+    vocab["aliases"] = {
+        z: sorted({norm_city(c) for c in alts})
+        for z, alts in zip(df["zip_code"], df["acceptable_cities"]) if alts
+    }
+    (out_dir / "vocab.json").write_text(json.dumps(vocab, separators=(",", ":")))
+    return len(df)
+
+
+class ZipIndex:
+    """Sorted ZIP array + parallel attribute arrays, memory-mapped read-only."""
+
+    def __init__(self, index_dir: Path = ZIP_INDEX_DIR):
+        index_dir = Path(index_dir)
+        if not (index_dir / "zip.npy").exists():
+            raise FileNotFoundError(f"ZIP index not found in {index_dir}")
+        load = lambda name: np.load(index_dir / f"{name}.npy", mmap_mode="r")
+        self.zip = load("zip")
+        self.city_id, self.state_id, self.county_id = load("city_id"), load("state_id"), load("county_id")
+        self.lat, self.lon = load("lat"), load("lon")
+        vocab = json.loads((index_dir / "vocab.json").read_text())
+        # object arrays (with a trailing "" for misses) so ids gather in one take()
+        self.cities = np.array(vocab["city"] + [""], dtype=object)
+        self.city_keys = np.array([norm_city(c) for c in vocab["city"]] + [""], dtype=object)
+        self.states = np.array(vocab["state"] + [""], dtype=object)
+        self.counties = np.array(vocab["county"] + [""], dtype=object)
+        self.aliases = {int(z): set(names) for z, names in vocab["aliases"].items()}
+
+    def lookup(self, zips: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Position of each ZIP in the index (clipped) and a found mask."""
+        pos = np.minimum(np.searchsorted(self.zip, zips), len(self.zip) - 1)
+        found = np.asarray(self.zip)[pos] == zips
+        return pos, found
+
+    def gather(self, ids: np.ndarray, vocab: np.ndarray, pos: np.ndarray, found: np.ndarray) -> np.ndarray:
+        return vocab[np.where(found, np.asarray(ids)[pos], len(vocab) - 1)]
+
+
+_index: ZipIndex | None = None
+
+
+def load_zip_index() -> ZipIndex:
+    global _index
+    if _index is None:
+        _index = ZipIndex()
+    return _index
+
+
+# ---------- NORMALISER ----------
+def _split_head(head: str, city_keys: set[str]) -> tuple[str, str, str]:
+    """
+    'Firm, LLP, 123 Main St, Ste 200, Los Angeles'
+        -> ('Firm, LLP', '123 Main St, Ste 200', 'Los Angeles').
+    The street runs from the first part with a house number up to the city, so
+    suite / floor parts stay attached and everything before it is the firm.
+    Without a comma before the city, peel off a known city name from the end.
+    """
+    parts = [p.strip() for p in head.split(",") if p.strip()]
+    if len(parts) >= 2:
+        body = parts[:-1]
+        start = next((i for i, p in enumerate(body) if any(c.isdigit() for c in p)), len(body) - 1)
+        if start and _UNIT.match(body[start]):
+            start -= 1   # 'One Market Plaza, Ste 5' - the street itself has no number
+        return ", ".join(body[:start]), ", ".join(body[start:]), parts[-1]
+    if not parts:
+        return "", "", ""
+    words = parts[0].split()
+    for n in range(min(4, len(words) - 1), 0, -1):
+        if norm_city(" ".join(words[-n:])) in city_keys:
+            return "", " ".join(words[:-n]), " ".join(words[-n:])
+    return "", "", parts[0]
+
+
+def normalize_addresses(addresses: pd.Series, index: ZipIndex | None = None) -> pd.DataFrame:
+    """
+    Parse, validate and standardise a whole column of one-line US addresses.
+
+    Returns a frame aligned with `addresses`:
+      Firm           - parts before the street (law firm or building name),
+      Street         - house number up to the city, unit / suite parts included,
+      City_Written   - the city as written ("" if the address did not parse),
+      City, State, Zip Code, County, Lat, Lon (ZIP centroid),
+      Address_Valid  - ZIP exists and belongs to the written state,
+      City_Matched   - written city is the ZIP's city or a USPS-accepted alias,
+      Address_Std    - "Street, City, ST 12345" for valid rows.
+    City/County/Lat/Lon always come from the index, never from the input text.
+    """
+    index = index or load_zip_index()
+    s = addresses.fillna("").astype(str).str.replace(r"\s+", " ", regex=True)
+    parts = s.str.extract(ADDRESS_RE)
+
+    zip5 = pd.to_numeric(parts["zip"], errors="coerce").fillna(-1).to_numpy(np.int64)
+    pos, found = index.lookup(zip5)
+    city = index.gather(index.city_id, index.cities, pos, found)
+    city_key = index.gather(index.city_id, index.city_keys, pos, found)
+    state = index.gather(index.state_id, index.states, pos, found)
+    county = index.gather(index.county_id, index.counties, pos, found)
+
+    written_state = parts["state"].str.upper().fillna("").to_numpy(dtype=object)
+    valid = found & (written_state == state)
+
+    firms, streets, written, matched = [], [], [], []
+    for head, z, c in zip(parts["head"].fillna(""), zip5.tolist(), city_key):
+        keys = {c} | index.aliases.get(z, set()) if c else set()
+        firm, street, written_city = _split_head(head, keys)
+        firms.append(firm)
+        streets.append(street)
+        written.append(written_city)
+        matched.append(norm_city(written_city) in keys)
+
+    street = pd.Series(streets, index=s.index, dtype=object)
+    zip5_s = parts["zip"].fillna("")
+    out = pd.DataFrame({
+        "Firm": firms,
+        "Street": street,
+        "City_Written": written,
+        "City": np.where(valid, city, ""),
+        "State": np.where(valid, state, written_state),
+        "Zip Code": zip5_s + ("-" + parts["zip4"]).fillna(""),
+        "County": np.where(valid, county, ""),
+        "Lat": np.where(valid, np.asarray(index.lat)[pos], np.nan).astype(np.float32),
+        "Lon": np.where(valid, np.asarray(index.lon)[pos], np.nan).astype(np.float32),
+        "Address_Valid": valid,
+        "City_Matched": valid & np.array(matched, dtype=bool),
+    }, index=s.index)
+    std = street.where(street == "", street + ", ") + out["City"] + ", " + out["State"] + " " + zip5_s
+    out["Address_Std"] = std.where(valid, "")
+    return out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "build":
+        n = build_zip_index(Path(sys.argv[2]))
+        print(f"[zip-index] {n} ZIPs -> {ZIP_INDEX_DIR}")
+    else:
+        print("usage: python src/parse_utils.py build path/to/zips.json.bz2")
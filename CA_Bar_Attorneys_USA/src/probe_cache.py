@@ -0,0 +1,122 @@
+"""
+Persistent record of which Bar Numbers were probed and what came back.
+
+Roaring-style layout: the key space is split into 65,536-number chunks (barno >> 16),
+allocated only when touched. Each chunk holds a uint8 outcome and a uint32 timestamp
+per number, so the whole CA range fits in a few MB and compresses to much less on disk.
+
+scrape_seek() asks should_skip() before each request and record()s every outcome,
+so reruns with a different INITIAL_START_NO / TARGET_COUNT only hit the network for
+numbers that are unknown or whose last result has expired.
+
+If a run cached bad outcomes (e.g. the site served block pages), drop them with:
+
+    python src/probe_cache.py purge data/probe_cache.npz not_found [--since UNIX_TS]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+UNKNOWN, FOUND, NOT_FOUND, ERROR = 0, 1, 2, 3
+OUTCOMES = {"found": FOUND, "not_found": NOT_FOUND, "error": ERROR}
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+# how long an outcome is trusted; FOUND is never skipped (we still need the row)
+TTL_S = {
+    NOT_FOUND: 90 * 86400,
+    ERROR: 1 * 86400,
+}
+SAVE_EVERY = 500  # record() calls between automatic saves
+
+
+class ProbeCache:
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.status: dict[int, np.ndarray] = {}
+        self.stamp: dict[int, np.ndarray] = {}
+        self._dirty = 0
+        if self.path.exists():
+            with np.load(self.path) as npz:
+                for name in npz.files:
+                    kind, hi = name.split("_")
+                    (self.status if kind == "s" else self.stamp)[int(hi)] = npz[name]
+
+    def _chunk(self, barno: int) -> tuple[np.ndarray, np.ndarray]:
+        hi = barno >> CHUNK_BITS
+        if hi not in self.status:
+            self.status[hi] = np.zeros(CHUNK_SIZE, dtype=np.uint8)
+            self.stamp[hi] = np.zeros(CHUNK_SIZE, dtype=np.uint32)
+        return self.status[hi], self.stamp[hi]
+
+    def get(self, barno: int) -> tuple[int, int]:
+        """(outcome, unix time of the probe); (UNKNOWN, 0) if never seen."""
+        hi = barno >> CHUNK_BITS
+        if hi not in self.status:
+            return UNKNOWN, 0
+        lo = barno & CHUNK_MASK
+        return int(self.status[hi][lo]), int(self.stamp[hi][lo])
+
+    def should_skip(self, barno: int, now: float | None = None) -> bool:
+        """True if barno recently came back empty or errored and is not stale yet."""
+        outcome, ts = self.get(barno)
+        ttl = TTL_S.get(outcome)
+        return ttl is not None and (now or time.time()) - ts < ttl
+
+    def record(self, barno: int, outcome: int):
+        status, stamp = self._chunk(barno)
+        lo = barno & CHUNK_MASK
+        status[lo] = outcome
+        stamp[lo] = int(time.time())
+        self._dirty += 1
+        if self._dirty >= SAVE_EVERY:
+            self.save()
+
+    def counts(self) -> dict[str, int]:
+        totals = np.zeros(4, dtype=np.int64)
+        for arr in self.status.values():
+            totals += np.bincount(arr, minlength=4)
+        return {name: int(totals[code]) for name, code in OUTCOMES.items()}
+
+    def purge(self, outcome: int, since: float = 0) -> int:
+        """Forget every `outcome` recorded at or after `since`; returns how many were reset."""
+        n = 0
+        for hi, status in self.status.items():
+            hit = (status == outcome) & (self.stamp[hi] >= since)
+            status[hit] = UNKNOWN
+            self.stamp[hi][hit] = 0
+            n += int(hit.sum())
+        self._dirty += n
+        return n
+
+    def save(self):
+        """Atomic write (tmp file + rename) so a killed run never corrupts the cache."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {f"s_{hi}": a for hi, a in self.status.items()}
+        arrays.update({f"t_{hi}": a for hi, a in self.stamp.items()})
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, self.path)
+        self._dirty = 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    since = 0.0
+    if len(args) == 5 and args[3] == "--since":
+        since = float(args[4])
+        args = args[:3]
+    if len(args) == 3 and args[0] == "purge" and args[2] in OUTCOMES:
+        cache = ProbeCache(args[1])
+        n = cache.purge(OUTCOMES[args[2]], since=since)
+        cache.save()
+        print(f"[probe-cache] purged {n} {args[2]} entries | {cache.counts()}")
+    else:
+        print("usage: python src/probe_cache.py purge path/to/probe_cache.npz found|not_found|error [--since UNIX_TS]")
@@ -1,17 +1,25 @@
 # src/scrape_ca_bar.py
+import os
 import re
 import time
 import csv
+from contextlib import closing
+from functools import partial
 from pathlib import Path
 
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-from tenacity import retry, stop_after_attempt, wait_fixed
+from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
+
+from parse_utils import normalize_addresses
+from pipeline import run_pipeline
+from probe_cache import ERROR, FOUND, NOT_FOUND, ProbeCache
 
 # ---------- CONFIG ----------
 OUT_XLSX = Path("outputs/CA_Bar_1k.xlsx")
 OUT_CSV  = Path("outputs/CA_Bar_1k.csv")
+PROBE_CACHE = Path("data/probe_cache.npz")   # outcomes of past probes, shared across runs
 DETAIL   = "https://apps.calbar.ca.gov/attorney/Licensee/Detail/{barno}"
 HEADERS  = {"User-Agent": "Mozilla/5.0 (portfolio-scraper; CA Bar directory; educational use)"}
 
@@ -22,6 +30,15 @@ REQUEST_TIMEOUT_S  = 7
 BASE_DELAY_S       = 0.28     # per-request delay
 SPARSE_JUMP_AFTER  = 1500     # if we scanned this many without a single "found"
 SPARSE_JUMP_STEP   = 10000    # jump this many bar numbers forward on sparse ranges
+FETCH_WORKERS      = 1        # concurrent requests; 1 keeps the BASE_DELAY_S pacing
+PARSE_WORKERS      = os.cpu_count() or 2   # parse processes running alongside the fetcher
+# normalize_addresses() columns exported after the scraped ones
+ADDRESS_COLUMNS    = ["Street", "County", "Lat", "Lon", "Address_Valid", "City_Matched"]
+# text the site shows for a bar number with no licensee; a 200 page with neither this
+# nor a "Name #12345" header (rate limit, CAPTCHA, redesign) is cached as ERROR instead
+NOT_FOUND_RE = re.compile(
+    r"no (?:records?|results?|licensees?|attorneys?)(?: were)? found|not found|does not exist"
+    r"|(?:invalid|unknown) (?:bar|license|licensee) number", re.I)
 
 
 # ---------- HELPERS ----------
@@ -116,50 +133,114 @@ def fetch_detail(barno: int) -> requests.Response:
     return r
 
 
+def miss_outcome(exc: Exception) -> int:
+    """
+    404/410 mean the bar number does not exist. Everything else (403 WAF blocks,
+    408/429, 5xx, timeouts) may be transient and only gets the short ERROR TTL.
+    """
+    if isinstance(exc, RetryError):
+        exc = exc.last_attempt.exception()
+    if isinstance(exc, requests.HTTPError) and str(exc) in ("404", "410"):
+        return NOT_FOUND
+    return ERROR
+
+
+def parse_detail(html: str) -> dict | None:
+    """
+    CPU half of a probe (runs in the parse pool): detail page -> row, or None if the
+    page says there is no such licensee. Raises ValueError for pages it cannot read.
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    # Robust name + bar number extraction
+    name, bar_number = parse_name_and_bar_from_soup(soup)
+    if not (name and bar_number):
+        if NOT_FOUND_RE.search(soup.get_text(" ", strip=True)):
+            return None
+        raise ValueError("no licensee header and no not-found notice (blocked or layout changed?)")
+
+    address = parse_address(soup)
+    city, zipc = parse_city_zip(address)
+    return {
+        "Attorney Name": name,
+        "Firm Name": parse_firm(address),
+        "Address": address,
+        "City": city,
+        "Zip Code": zipc,
+        "Phone Number": parse_phone(soup),
+        "Email": parse_email(soup),
+        "Present Status": parse_present_status(soup),
+        "Admission Date": parse_admission_date(soup),
+        "Bar Number": bar_number,
+    }
+
+
+def fetch_page(barno: int, delay_sec: float) -> str:
+    """Network half of a probe (runs on a fetch thread); raises on non-200 / timeout."""
+    try:
+        resp = fetch_detail(barno)
+    except Exception:
+        time.sleep(0.02)
+        raise
+    time.sleep(delay_sec)
+    return resp.text
+
+
 # ---------- SCRAPER ----------
-def scrape_seek(start_no: int, target_count: int, max_scan: int, delay_sec: float):
+def scrape_seek(start_no: int, target_count: int, max_scan: int, delay_sec: float,
+                cache: ProbeCache | None = None,
+                fetchers: int = FETCH_WORKERS, parsers: int = PARSE_WORKERS):
     rows = []
     found = 0
     scanned = 0
-    barno = start_no
+    skipped = 0
+    probed = 0
     since_last_found = 0
 
     print(f"[start] seeking from {start_no} for {target_count} rows (max_scan={max_scan})", flush=True)
 
-    while found < target_count and scanned < max_scan:
-        scanned += 1
-        since_last_found += 1
-
-        try:
-            resp = fetch_detail(barno)
-        except Exception:
-            # non-200 or timeout: skip forward
-            barno += 1
-            if scanned % 400 == 0:
-                print(f"[progress] scanned ~{scanned}, found {found} (last bar {barno})", flush=True)
-            time.sleep(0.02)
-            continue
-
-        soup = BeautifulSoup(resp.text, "lxml")
-
-        # Robust name + bar number extraction
-        name, bar_number = parse_name_and_bar_from_soup(soup)
-
-        if name and bar_number:
-            address = parse_address(soup)
-            city, zipc = parse_city_zip(address)
-            row = {
-                "Attorney Name": name,
-                "Firm Name": parse_firm(address),
-                "Address": address,
-                "City": city,
-                "Zip Code": zipc,
-                "Phone Number": parse_phone(soup),
-                "Email": parse_email(soup),
-                "Present Status": parse_present_status(soup),
-                "Admission Date": parse_admission_date(soup),
-                "Bar Number": bar_number,
-            }
+    def bar_numbers():
+        # Runs ahead of the parsers by up to MAX_IN_FLIGHT numbers, so the stop
+        # condition and sparse jumps react to results with that much lag.
+        nonlocal scanned, skipped, since_last_found
+        barno = start_no
+        while found < target_count and scanned < max_scan:
+            since_last_found += 1
+
+            # known-empty from an earlier run: no request, but it still counts towards a sparse jump
+            if cache is not None and cache.should_skip(barno):
+                skipped += 1
+            else:
+                scanned += 1
+                yield barno
+
+            # auto-jump over sparse ranges
+            if since_last_found >= SPARSE_JUMP_AFTER:
+                jump_from = barno
+                barno += SPARSE_JUMP_STEP
+                since_last_found = 0
+                print(f"[jump] sparse range detected; jumping from {jump_from} -> {barno}", flush=True)
+            else:
+                barno += 1
+
+    fetch = partial(fetch_page, delay_sec=delay_sec)
+    with closing(run_pipeline(bar_numbers(), fetch, parse_detail, fetchers=fetchers, parsers=parsers)) as results:
+        for barno, row, err in results:
+            probed += 1
+            if probed % 400 == 0:
+                print(f"[progress] scanned ~{probed}, found {found} (last bar {barno})", flush=True)
+
+            if err is not None:
+                # non-200, timeout or unreadable page: skip forward
+                if cache is not None:
+                    cache.record(barno, miss_outcome(err))
+                continue
+
+            if cache is not None:
+                cache.record(barno, FOUND if row else NOT_FOUND)
+            if row is None:
+                continue
+
             rows.append(row)
             found += 1
             since_last_found = 0
@@ -171,36 +252,50 @@ def scrape_seek(start_no: int, target_count: int, max_scan: int, delay_sec: floa
             if found % 25 == 0:
                 print(f"[found] {found}/{target_count} (bar {barno})", flush=True)
 
-        # auto-jump over sparse ranges
-        if since_last_found >= SPARSE_JUMP_AFTER:
-            jump_from = barno
-            barno += SPARSE_JUMP_STEP
-            since_last_found = 0
-            print(f"[jump] sparse range detected; jumping from {jump_from} -> {barno}", flush=True)
-        else:
-            barno += 1
-
-        time.sleep(delay_sec)
+            if found >= target_count:
+                break
 
-    print(f"[done] scanned ~{scanned}, found {found}", flush=True)
+    print(f"[done] scanned ~{probed}, found {found}, skipped {skipped} known-empty", flush=True)
     return rows
 
 
 def main():
     Path("outputs").mkdir(parents=True, exist_ok=True)
 
-    data = scrape_seek(
-        start_no=INITIAL_START_NO,              # <— change this if you want to start elsewhere
-        target_count=TARGET_COUNT,
-        max_scan=MAX_SCAN_ATTEMPTS,
-        delay_sec=BASE_DELAY_S,
-    )
+    cache = ProbeCache(PROBE_CACHE)
+    print(f"[cache] {PROBE_CACHE}: {cache.counts()}", flush=True)
+    try:
+        data = scrape_seek(
+            start_no=INITIAL_START_NO,              # <— change this if you want to start elsewhere
+            target_count=TARGET_COUNT,
+            max_scan=MAX_SCAN_ATTEMPTS,
+            delay_sec=BASE_DELAY_S,
+            cache=cache,
+        )
+    finally:
+        cache.save()
 
     df = pd.DataFrame(data, columns=[
         "Attorney Name","Firm Name","Address","City","Zip Code",
         "Phone Number","Email","Present Status","Admission Date","Bar Number"
     ])
 
+    # split / validate addresses against the bundled ZIP index; parse_detail's comma
+    # guesses only survive for addresses without a trailing "ST 12345"
+    norm = normalize_addresses(df["Address"])
+    parsed = norm["Zip Code"] != ""
+    ok = norm["Address_Valid"]
+    same_city = norm["City_Matched"]
+    df.loc[parsed, "Firm Name"] = norm.loc[parsed, "Firm"]
+    df.loc[parsed, "Zip Code"] = norm.loc[parsed, "Zip Code"]
+    # ZIP's primary city replaces the written one only when they agree (case,
+    # punctuation, USPS alias); otherwise keep what was written - Belmont is not San Mateo
+    city = norm["City"].where(same_city, norm["City_Written"])
+    df.loc[parsed, "City"] = city[parsed]
+    df[ADDRESS_COLUMNS] = norm[ADDRESS_COLUMNS]
+    print(f"[address] {int(ok.sum())}/{len(df)} addresses validated against the ZIP index, "
+          f"{int((ok & ~same_city).sum())} with a city that is not the ZIP's", flush=True)
+
     df.to_excel(OUT_XLSX, index=False)
     df.to_csv(OUT_CSV, index=False, quoting=csv.QUOTE_MINIMAL)
     print(f"[saved] {len(df)} rows -> {OUT_XLSX} / {OUT_CSV}", flush=True)
@@ -0,0 +1,312 @@
+"""
+Template-driven ingestion for lead workbooks / CSVs.
+
+A deliverable template's header row is the schema: column names, plus a field type
+guessed from each name (email, phone, url, state, zip, int, text). Input files are
+streamed row by row (openpyxl read-only mode / csv.reader), every row is coerced
+against the schema, and we write two CSVs as we go:
+
+    <out>.csv         rows that passed, in template column order
+    <out>_errors.csv  one line per problem: source row, column, value, message
+
+Nothing is held in memory beyond the current row, so 2,500-district lists and much
+larger inputs run with flat memory.
+
+    python scripts/ingest.py fsd_districts data/raw/districts_filled.xlsx
+"""
+
+import argparse
+import csv
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+ROOT = Path(__file__).resolve().parents[2]   # Python_Projects/
+OUT_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+
+HEADER_SCAN_ROWS = 10   # how far down an input file we look for its header row
+
+EMAIL_RE = re.compile(r"^[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}$", re.I)
+URL_RE = re.compile(r"^(https?://)?[\w-]+(\.[\w-]+)+(/\S*)?$", re.I)
+
+
+@dataclass
+class TemplateSpec:
+    path: Path
+    sheet: str | None = None        # default: first sheet
+    header_row: int | None = None   # 1-based; default: first row with 2+ text cells
+    start_col: str = "A"            # ignore helper columns left of this
+    required: list[str] = field(default_factory=list)   # default: first column
+    # schema column -> template column that lists its allowed values (dropdown source)
+    choices: dict[str, str] = field(default_factory=dict)
+
+
+TEMPLATES = {
+    "gp_az": TemplateSpec(
+        ROOT / "Lead_Generation_GP_AZ" / "Database Template.xlsx",
+        sheet="DATABASE", header_row=1, start_col="L",
+        required=["PROSPECT NAME", "MERCH CATEGORY"],
+        choices={"MERCH CATEGORY": "MERCH CATEGORIES"},
+    ),
+    "fsd_districts": TemplateSpec(
+        ROOT / "Food_Service_Directors_US_Leads" / "data" / "raw" / "district_list_template.csv.xlsx",
+        sheet="Table1",
+        required=["County/District", "State_Abbreviation"],
+    ),
+    "antwerp_agents": TemplateSpec(
+        ROOT / "Real_Estate_Agents_Antwerp" / "RE_agents_list.xlsx",
+        sheet="List of all the companys",
+        required=["City name", "Company name"],
+    ),
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+# ---------- COERCERS ----------
+def to_text(v: Any) -> str:
+    return " ".join(str(v).split())
+
+
+def to_email(v: Any) -> str:
+    s = to_text(v).lower().removeprefix("mailto:")
+    if not EMAIL_RE.match(s):
+        raise RowError("not a valid email")
+    return s
+
+
+def to_phone(v: Any) -> str:
+    if isinstance(v, float) and v.is_integer():   # Excel stores bare numbers as floats
+        v = int(v)
+    s = to_text(v)
+    digits = re.sub(r"\D", "", s)
+    if not 7 <= len(digits) <= 15:
+        raise RowError("phone needs 7-15 digits")
+    return s
+
+
+def to_url(v: Any) -> str:
+    s = to_text(v)
+    if not URL_RE.match(s):
+        raise RowError("not a valid URL")
+    return s if s.lower().startswith("http") else "https://" + s
+
+
+def to_state(v: Any) -> str:
+    s = to_text(v).upper()
+    if not re.fullmatch(r"[A-Z]{2}", s):
+        raise RowError("state must be a 2-letter code")
+    return s
+
+
+def to_zip(v: Any) -> str:
+    s = to_text(v)
+    s = s.zfill(5) if s.isdigit() and len(s) < 5 else s   # Excel drops leading zeros
+    if not re.fullmatch(r"\d{5}(-\d{4})?", s):
+        raise RowError("ZIP must be 12345 or 12345-6789")
+    return s
+
+
+def to_int(v: Any) -> int:
+    if isinstance(v, (int, float)) and float(v).is_integer():
+        return int(v)
+    s = to_text(v).replace(",", "")
+    if not re.fullmatch(r"\d+", s):
+        raise RowError("expected a whole number")
+    return int(s)
+
+
+def field_type(name: str) -> Callable[[Any], Any]:
+    """Guess a coercer from the header text."""
+    n = name.strip().lower()
+    if "email" in n:
+        return to_email
+    if "phone" in n:
+        return to_phone
+    if "website" in n or "url" in n:
+        return to_url
+    if n.startswith("state"):
+        return to_state
+    if "zip" in n or "postal" in n:
+        return to_zip
+    if n.startswith("#") or n in ("nr", "nr.", "no", "no."):
+        return to_int
+    return to_text
+
+
+def is_blank(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip())
+
+
+def norm_header(v: Any) -> str:
+    return to_text(v).lower() if v is not None else ""
+
+
+# ---------- SCHEMA ----------
+@dataclass
+class Column:
+    name: str
+    coerce: Callable[[Any], Any]
+    required: bool = False
+    allowed: set[str] | None = None
+
+
+def _iter_template_rows(spec: TemplateSpec) -> Iterator[tuple]:
+    wb = load_workbook(spec.path, read_only=True, data_only=True)
+    try:
+        ws = wb[spec.sheet] if spec.sheet else wb.worksheets[0]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def read_schema(spec: TemplateSpec) -> list[Column]:
+    """Columns (in template order) from the template's header row."""
+    rows = list(_iter_template_rows(spec))
+    if spec.header_row:
+        hdr_idx = spec.header_row - 1
+    else:
+        hdr_idx = next(i for i, r in enumerate(rows)
+                       if sum(isinstance(v, str) and v.strip() != "" for v in r) >= 2)
+    header = rows[hdr_idx]
+    first = column_index_from_string(spec.start_col) - 1
+
+    names = [to_text(v) for v in header[first:] if v is not None and to_text(v)]
+    required = {norm_header(r) for r in (spec.required or names[:1])}
+    schema = [Column(n, field_type(n), norm_header(n) in required) for n in names]
+
+    # dropdown sources live in their own template column, listed below the header
+    for col in schema:
+        src = spec.choices.get(col.name)
+        if src is None:
+            continue
+        j = [norm_header(v) for v in header].index(norm_header(src))
+        col.allowed = {to_text(r[j]).lower() for r in rows[hdr_idx + 1:] if j < len(r) and r[j] is not None}
+    return schema
+
+
+# ---------- INPUT ----------
+def iter_input(path: Path, sheet: str | None = None) -> Iterator[tuple]:
+    """Stream raw rows from .xlsx (read-only mode) or .csv."""
+    if path.suffix.lower() in (".csv", ".txt"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from (tuple(r) for r in csv.reader(f))
+        return
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def map_header(row: tuple, schema: list[Column]) -> dict[int, Column] | None:
+    """Input column index -> schema column, or None if this row is not the header."""
+    wanted = {norm_header(c.name): c for c in schema}
+    # a name can repeat (GP_AZ lists CUISINE TYPE values left of the data area);
+    # helper columns come first, so the last occurrence is the data column
+    by_name = {norm_header(v): i for i, v in enumerate(row) if norm_header(v) in wanted}
+    mapping = {i: wanted[name] for name, i in by_name.items()}
+    return mapping if len(mapping) >= max(1, len(schema) // 2) else None
+
+
+# ---------- INGEST ----------
+@dataclass
+class IngestResult:
+    rows: int = 0
+    valid: int = 0
+    invalid: int = 0
+    errors: int = 0
+    unmapped: list[str] = field(default_factory=list)
+
+
+def coerce_row(raw: tuple, mapping: dict[int, Column], schema: list[Column]) -> tuple[dict, list[tuple]]:
+    """Coerce one input row; returns (clean_row, [(column, value, message), ...])."""
+    out = {c.name: None for c in schema}
+    problems = []
+    for i, col in mapping.items():
+        v = raw[i] if i < len(raw) else None
+        if is_blank(v):
+            continue
+        try:
+            out[col.name] = col.coerce(v)
+        except RowError as e:
+            problems.append((col.name, v, str(e)))
+            continue
+        if col.allowed is not None and str(out[col.name]).lower() not in col.allowed:
+            problems.append((col.name, v, "not one of the template's allowed values"))
+    for col in schema:
+        if col.required and out[col.name] in (None, ""):
+            if not any(p[0] == col.name for p in problems):
+                problems.append((col.name, None, "required"))
+    return out, problems
+
+
+def ingest(template: str | TemplateSpec, src: Path, out: Path, sheet: str | None = None) -> IngestResult:
+    spec = TEMPLATES[template] if isinstance(template, str) else template
+    schema = read_schema(spec)
+    res = IngestResult()
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    err_path = out.with_name(out.stem + "_errors.csv")
+    with open(out, "w", newline="", encoding="utf-8") as fo, open(err_path, "w", newline="", encoding="utf-8") as fe:
+        ok_w = csv.DictWriter(fo, fieldnames=[c.name for c in schema])
+        err_w = csv.writer(fe)
+        ok_w.writeheader()
+        err_w.writerow(["source_row", "column", "value", "message"])
+
+        mapping = None
+        for n, raw in enumerate(iter_input(src, sheet), start=1):
+            if mapping is None:
+                mapping = map_header(raw, schema)
+                if mapping is None and n >= HEADER_SCAN_ROWS:
+                    raise ValueError(f"{src}: no header matching the template in the first {n} rows")
+                if mapping is not None:
+                    seen = {c.name for c in mapping.values()}
+                    res.unmapped = [c.name for c in schema if c.name not in seen]
+                    missing = [c.name for c in schema if c.required and c.name not in seen]
+                    if missing:
+                        raise ValueError(f"{src}: required columns missing: {missing}")
+                continue
+            if all(is_blank(raw[i]) for i in mapping if i < len(raw)):
+                continue   # spacer rows, or rows only filled in helper columns
+
+            res.rows += 1
+            row, problems = coerce_row(raw, mapping, schema)
+            if problems:
+                res.invalid += 1
+                res.errors += len(problems)
+                err_w.writerows((n, col, v, msg) for col, v, msg in problems)
+            else:
+                res.valid += 1
+                ok_w.writerow(row)
+
+    if mapping is None:
+        raise ValueError(f"{src}: empty file or no header row found")
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Validate a lead file against a deliverable template.")
+    ap.add_argument("template", choices=sorted(TEMPLATES))
+    ap.add_argument("input", type=Path)
+    ap.add_argument("--sheet", help="input sheet name (xlsx only; default first sheet)")
+    ap.add_argument("--out", type=Path, help="valid-rows CSV (default data/processed/<input>_clean.csv)")
+    args = ap.parse_args()
+
+    out = args.out or OUT_DIR / f"{args.input.stem}_clean.csv"
+    res = ingest(args.template, args.input, out, sheet=args.sheet)
+    if res.unmapped:
+        print(f"[warn] template columns not in input: {res.unmapped}")
+    print(f"[ingest] {res.rows} rows | {res.valid} valid -> {out} | "
+          f"{res.invalid} invalid ({res.errors} problems) -> {out.with_name(out.stem + '_errors.csv')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Contact-page discovery from robots.txt + sitemap.xml, with cheap HEAD fallbacks.
+
+Per domain we fetch robots.txt once, follow its Sitemap: lines (or /sitemap.xml),
+expand sitemap indexes (plain or .gz) and rank the listed URLs by how much they look
+like a contact/about page. Sitemaps are read lazily and reading stops at the first URL
+that scores as a real contact page; blog/product child sitemaps are never fetched.
+probe_contact_url() is the cheap last resort: it checks CANDIDATE_PATHS with HEAD
+instead of full GETs. robots.txt is read once per domain; the caller
+(enrich_contacts.best_contact_url) caches the final answer per domain.
+"""
+
+import gzip
+import io
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterator
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = 15
+
+CANDIDATE_PATHS = ["contact", "contact-us", "contactus", "about", "company", "team"]
+
+MAX_SITEMAPS = 4                # sitemap documents fetched per domain (index + children)
+MAX_SITEMAP_BYTES = 10_000_000  # ignore absurdly large (decompressed) sitemaps
+CHUNK_SIZE = 65_536
+MIN_SCORE = 3                   # below this a sitemap URL is not worth returning
+CONTACT_SCORE = 8               # "contact" in the last path segment: stop reading sitemaps
+
+# path keyword -> score; the best-scoring URL in the sitemap wins
+KEYWORDS = [
+    (re.compile(r"contact[-_]?us|get[-_]in[-_]touch"), 12),
+    (re.compile(r"contact"), 10),
+    (re.compile(r"about[-_]?us"), 6),
+    (re.compile(r"about"), 5),
+    (re.compile(r"locations?|offices?"), 4),
+    (re.compile(r"company"), 3),
+    (re.compile(r"team|leadership"), 2),
+]
+# child sitemaps worth reading first / never reading inside a sitemap index
+GOOD_CHILD = re.compile(r"page|main|static|general", re.I)
+BAD_CHILD = re.compile(r"post|product|blog|news|article|image|video|tag|categor|author", re.I)
+
+_robots: dict[str, tuple[RobotFileParser, list[str]]] = {}
+
+
+def _local(tag: str) -> str:
+    # '{http://www.sitemaps.org/schemas/sitemap/0.9}loc' -> 'loc'
+    return tag.rsplit("}", 1)[-1]
+
+
+def fetch_bytes(url: str) -> bytes | None:
+    """Body of url, or None on errors / non-200 / more than MAX_SITEMAP_BYTES (stops reading there)."""
+    buf = bytearray()
+    try:
+        with requests.get(url, headers=HEADERS, timeout=TIMEOUT, stream=True) as r:
+            if r.status_code != 200:
+                return None
+            for chunk in r.iter_content(CHUNK_SIZE):
+                buf += chunk
+                if len(buf) > MAX_SITEMAP_BYTES:
+                    return None
+    except requests.RequestException:
+        return None
+    data = bytes(buf)
+    # .xml.gz served as application/octet-stream (requests only undoes Content-Encoding)
+    if data[:2] == b"\x1f\x8b":
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
+                data = gz.read(MAX_SITEMAP_BYTES + 1)
+        except (OSError, EOFError):
+            return None
+    return data if len(data) <= MAX_SITEMAP_BYTES else None
+
+
+def read_robots(base: str) -> tuple[RobotFileParser, list[str]]:
+    """Parse /robots.txt; returns the parser (for can_fetch) and any Sitemap: URLs."""
+    rp = RobotFileParser()
+    data = fetch_bytes(urljoin(base, "/robots.txt"))
+    lines = data.decode("utf-8", "replace").splitlines() if data else []
+    rp.parse(lines)
+    sitemaps = [ln.split(":", 1)[1].strip() for ln in lines if ln.lower().startswith("sitemap:")]
+    return rp, sitemaps
+
+
+def parse_sitemap(data: bytes) -> tuple[list[str], list[str]]:
+    """Return (page_urls, child_sitemap_urls) from a <urlset> or <sitemapindex>."""
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return [], []
+    locs = [el.text.strip() for el in root.iter() if _local(el.tag) == "loc" and el.text]
+    if _local(root.tag) == "sitemapindex":
+        return [], locs
+    return locs, []
+
+
+def score_url(url: str, domain: str) -> int:
+    u = urlparse(url)
+    if u.netloc.lower().removeprefix("www.") != domain:
+        return 0
+    path = u.path.lower().rstrip("/")
+    if not path:
+        return 0
+    parent, _, last = path.rpartition("/")
+    if BAD_CHILD.search(parent):  # /blog/how-to-contact-us is an article, not the page
+        return 0
+    score = 0
+    for rx, pts in KEYWORDS:
+        if rx.search(last):
+            score = max(score, pts)
+        elif rx.search(path):
+            score = max(score, pts - 2)
+    # prefer shallow pages: /contact over /blog/2021/how-to-contact-support
+    return score - path.count("/") + 1 if score else 0
+
+
+def sitemap_candidates(base: str, sitemaps: list[str]) -> Iterator[str]:
+    """
+    Page URLs from up to MAX_SITEMAPS sitemap documents, best-looking children first.
+    Lazy: the next document is only fetched once the caller has consumed the last one.
+    """
+    queue = list(sitemaps) or [urljoin(base, "/sitemap.xml")]
+    seen = set()
+    while queue and len(seen) < MAX_SITEMAPS:
+        sm = queue.pop(0)
+        if sm in seen:
+            continue
+        seen.add(sm)
+        data = fetch_bytes(sm)
+        if not data:
+            continue
+        urls, children = parse_sitemap(data)
+        yield from urls
+        children = [c for c in children if not BAD_CHILD.search(c)]
+        children.sort(key=lambda c: not GOOD_CHILD.search(c))
+        queue.extend(children)
+
+
+def head_ok(url: str) -> bool:
+    try:
+        r = requests.head(url, headers=HEADERS, timeout=TIMEOUT, allow_redirects=True)
+    except requests.RequestException:
+        return False
+    ctype = r.headers.get("Content-Type", "")
+    return r.status_code == 200 and (not ctype or "text/html" in ctype)
+
+
+def _robots_for(site_url: str) -> tuple[str, str, RobotFileParser, list[str]]:
+    """(base, domain, robots parser, sitemap URLs); robots.txt is fetched once per domain."""
+    u = urlparse(site_url)
+    domain = u.netloc.lower().removeprefix("www.")
+    base = f"{u.scheme}://{u.netloc}"
+    if domain not in _robots:
+        _robots[domain] = read_robots(base)
+    return base, domain, *_robots[domain]
+
+
+def sitemap_contact_url(site_url: str) -> str | None:
+    """Best-ranked contact/about URL from the domain's sitemaps, or None."""
+    base, domain, rp, sitemaps = _robots_for(site_url)
+    best, best_score = None, 0
+    for page in sitemap_candidates(base, sitemaps):
+        s = score_url(page, domain)
+        if s > best_score and rp.can_fetch(HEADERS["User-Agent"], page):
+            best, best_score = page, s
+            if s >= CONTACT_SCORE:
+                break   # good enough; don't fetch the remaining sitemaps
+    return best if best_score >= MIN_SCORE else None
+
+
+def probe_contact_url(site_url: str) -> str | None:
+    """First of CANDIDATE_PATHS that answers a HEAD with 200 text/html, or None."""
+    base, _, rp, _ = _robots_for(site_url)
+    for slug in CANDIDATE_PATHS:
+        candidate = f"{base}/{slug}"
+        if rp.can_fetch(HEADERS["User-Agent"], candidate) and head_ok(candidate):
+            return candidate
+    return None
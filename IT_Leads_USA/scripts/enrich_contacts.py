@@ -1,5 +1,9 @@
+import argparse
+import codecs
 import re
 import time
+from html import unescape
+from typing import Iterator
 from urllib.parse import urljoin, urlparse
 
 import pandas as pd
@@ -7,56 +11,98 @@ import requests
 from bs4 import BeautifulSoup
 from pathlib import Path
 
+from discovery import probe_contact_url, sitemap_contact_url
+from frontier import Frontier
+from pipeline import PARSERS, run_pipeline
+
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 SEED_CSV = Path("data/processed/companies_seed.csv")
 OUT_CSV = Path("data/processed/it_companies_enriched.csv")
 
-EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
+# lookbehind: only try from the start of a run, else long @-less runs go quadratic
+EMAIL_RE = re.compile(r"(?<![A-Z0-9._%+-])[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
 PHONE_RE = re.compile(r"""
     (?:(?:\+1[\s\-\.])?        # optional +1
      (?:\(?\d{3}\)?[\s\-\.]?)  # area code
      \d{3}[\s\-\.]?\d{4})      # local
 """, re.X)
+ADDRESS_RE = re.compile(r",\s*[A-Z]{2}\s+\d{5}(?:-\d{4})?$")  # e.g., San Jose, CA 95110
 
-CANDIDATE_PATHS = ["contact", "contact-us", "contactus", "about", "company", "team"]
+# Regex-only HTML handling for the fetch threads: it runs in C, so a fetcher never
+# holds the GIL for long. Anything that needs a real parser belongs in parse_stage.
+SKIP_RE = re.compile(r"<(script|style|noscript|template)\b.*?(?:</\1\s*>|\Z)", re.I | re.S)
+SKIP_OPEN_RE = re.compile(r"<(script|style|noscript|template)\b", re.I)
+TAG_RE = re.compile(r"<[^>]*>")
+LINK_RE = re.compile(r"<a\b([^>]*)>(.*?)</a\s*>", re.I | re.S)
+HREF_RE = re.compile(r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+ADDRESS_LINE_RE = re.compile(r",\s*[A-Z]{2}\s+\d{5}(?:-\d{4})?[ \t]*$", re.M)
 
-def get(url, timeout=20):
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=timeout)
-        if r.status_code == 200 and "text/html" in r.headers.get("Content-Type", ""):
-            return r.text
-    except requests.RequestException:
-        return None
-    return None
+BYTE_BUDGET = 512_000   # max bytes read from a contact page in streaming mode
+CHUNK_SIZE = 16_384
+FETCHERS = 1            # each fetch thread sleeps 1s per company, so N threads ~ N req/s
+
+_contact_cache: dict[str, str | None] = {}  # domain -> best_contact_url() answer
 
 def best_contact_url(site_url: str) -> str | None:
-    """Find a likely Contact page from homepage links or common paths."""
+    """Find a likely Contact page: sitemap, then homepage links, then HEAD probes (cached per domain)."""
     if not site_url:
         return None
     if not site_url.startswith("http"):
         site_url = "http://" + site_url
 
+    domain = urlparse(site_url).netloc.lower().removeprefix("www.")
+    if domain not in _contact_cache:
+        _contact_cache[domain] = _find_contact_url(site_url)
+    return _contact_cache[domain]
+
+def _find_contact_url(site_url: str) -> str | None:
+    # 1) robots.txt + sitemap ranking
+    found = sitemap_contact_url(site_url)
+    if found:
+        return found
+
+    # 2) Look for nav/footer links containing 'contact' (one homepage GET)
     html = get(site_url)
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "lxml")
+    link = contact_link(html)
+    if link:
+        return urljoin(site_url, link)
 
-    # 1) Look for nav/footer links containing 'contact'
-    for a in soup.select("a[href]"):
-        text = (a.get_text(" ", strip=True) or "").lower()
-        href = a["href"].lower()
-        if "contact" in text or "contact" in href:
-            return urljoin(site_url, a["href"])
+    # 3) HEAD-probe common paths
+    return probe_contact_url(site_url) or site_url  # fallback to homepage
 
-    # 2) Try common fallbacks
-    base = site_url.rstrip("/")
-    for slug in CANDIDATE_PATHS:
-        candidate = f"{base}/{slug}"
-        if get(candidate):
-            return candidate
+def contact_link(html: str) -> str | None:
+    """href of the first <a> whose target or text mentions 'contact'."""
+    for m in LINK_RE.finditer(html):
+        h = HREF_RE.search(m.group(1))
+        if not h:
+            continue
+        href = unescape(next(g for g in h.groups() if g is not None))
+        if "contact" in href.lower() or "contact" in TAG_RE.sub(" ", m.group(2)).lower():
+            return href
+    return None
 
-    return site_url  # fallback to homepage
+def scan_contact_details(html: str, start: int, seen: set[str]) -> int:
+    """
+    Add "email" / "phone" / "address" to `seen` for those visible in html[start:].
+    Returns where the next call should start: the last tag (the text after it may
+    continue in the next chunk) or an unclosed <script>/<style>, so each byte of a
+    streamed page is scanned about once.
+    """
+    window = html[start:]
+    text = TAG_RE.sub("\n", SKIP_RE.sub("", window))
+    for name, rx in (("email", EMAIL_RE), ("phone", PHONE_RE), ("address", ADDRESS_LINE_RE)):
+        if name not in seen and rx.search(text):
+            seen.add(name)
+    restart = max(window.rfind("<"), 0)
+    opener = None
+    for opener in SKIP_OPEN_RE.finditer(window):
+        pass
+    if opener and not re.search(rf"</{opener.group(1)}\s*>", window[opener.end():], re.I):
+        restart = opener.start()
+    return start + restart
 
 def extract_email_phone_address(html: str) -> tuple[str | None, str | None, str | None]:
     if not html:
@@ -74,42 +120,143 @@ def extract_email_phone_address(html: str) -> tuple[str | None, str | None, str
     address = None
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
     for ln in lines:
-        # e.g., San Jose, CA 95110
-        if re.search(r",\s*[A-Z]{2}\s+\d{5}(?:-\d{4})?$", ln):
+        if ADDRESS_RE.search(ln):
             address = ln
             break
 
     return email, phone, address
 
-def main():
-    df = pd.read_csv(SEED_CSV)
-    rows = []
-    for i, row in df.iterrows():
-        name = row.get("Company")
-        site = row.get("Website")
-        wiki = row.get("Wikipedia")
-        contact_url = best_contact_url(site) if pd.notna(site) else None
-
-        html = get(contact_url) if contact_url else None
-        email, phone, address = extract_email_phone_address(html) if html else (None, None, None)
-
-        rows.append({
-            "Company": name,
-            "Website": site,
-            "Contact_URL": contact_url,
-            "Email": email,
-            "Phone": phone,
-            "Address": address,
-            "Wikipedia": wiki
-        })
-
-        print(f"[{i+1}/{len(df)}] {name}: email={email} phone={phone}")
-        time.sleep(1)  # be polite
+def stream_html(url, byte_budget=BYTE_BUDGET, timeout=20) -> Iterator[str]:
+    """
+    Yield decoded text of url in CHUNK_SIZE pieces, at most byte_budget bytes.
+    Non-200 / non-HTML responses are dropped on their headers, before any body
+    is downloaded. Stop iterating early to close the connection.
+    """
+    try:
+        with requests.get(url, headers=HEADERS, timeout=timeout, stream=True) as r:
+            if r.status_code != 200 or "text/html" not in r.headers.get("Content-Type", ""):
+                return
+            decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+            read = 0
+            for chunk in r.iter_content(CHUNK_SIZE):
+                yield decoder.decode(chunk)
+                read += len(chunk)
+                if read >= byte_budget:
+                    return
+    except (requests.RequestException, LookupError):
+        return
+
+def get(url, timeout=20, byte_budget=BYTE_BUDGET) -> str | None:
+    """HTML body of url (at most byte_budget bytes), or None for errors / non-HTML."""
+    return "".join(stream_html(url, byte_budget, timeout)) or None
+
+def get_contact_page(url, timeout=20, byte_budget=BYTE_BUDGET) -> str | None:
+    """Like get(), but stop reading once an email, phone and address have all streamed past."""
+    html, start, seen = "", 0, set()
+    for text in stream_html(url, byte_budget, timeout):
+        html += text
+        start = scan_contact_details(html, start, seen)
+        if len(seen) == 3:
+            break
+    return html or None
+
+# ---------- pipelined mode: fetch on threads, parse on a process pool ----------
+def fetch_stage(company: dict) -> dict:
+    # network + regex only; every BeautifulSoup parse happens in parse_stage
+    contact_url = best_contact_url(company["Website"]) if pd.notna(company["Website"]) else None
+    html = get_contact_page(contact_url) if contact_url else None
+    time.sleep(1)  # be polite (per fetcher thread)
+    return {**company, "Contact_URL": contact_url, "html": html}
+
+def parse_stage(fetched: dict) -> dict:
+    # module-level so it pickles to the process pool
+    email, phone, address = extract_email_phone_address(fetched["html"])
+    return {
+        "Company": fetched["Company"],
+        "Website": fetched["Website"],
+        "Contact_URL": fetched["Contact_URL"],
+        "Email": email,
+        "Phone": phone,
+        "Address": address,
+        "Wikipedia": fetched["Wikipedia"]
+    }
+
+def enrich_company(name, site, wiki) -> dict:
+    """One company end to end (frontier workers); same path as the pipelined run."""
+    return parse_stage(fetch_stage({"Company": name, "Website": site, "Wikipedia": wiki}))
 
+def save(rows):
     out = pd.DataFrame(rows)
     OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
     out.to_csv(OUT_CSV, index=False)
     print(f"Saved enriched rows to {OUT_CSV}")
 
+# ---------- frontier mode (split one job across many worker processes) ----------
+def seed_frontier(db):
+    df = pd.read_csv(SEED_CSV)
+    items = []
+    for _, row in df.iterrows():
+        # key on the website so duplicate seeds collapse; fall back to the name
+        key = row.get("Website") if pd.notna(row.get("Website")) else row.get("Company")
+        payload = {c: (row.get(c) if pd.notna(row.get(c)) else None) for c in ("Company", "Website", "Wikipedia")}
+        items.append((str(key), payload, 0))
+    with Frontier(db) as fr:
+        added = fr.add_many(items)
+        print(f"Seeded {added} new tasks into {db} | {fr.stats()}")
+
+def run_worker(db):
+    with Frontier(db) as fr:
+        for n, task in enumerate(fr.iter_tasks(), start=1):
+            p = task.payload
+            try:
+                row = enrich_company(p["Company"], p["Website"], p["Wikipedia"])
+            except Exception as e:
+                fr.fail(task.key, repr(e))
+                print(f"[{fr.worker_id}] {p['Company']}: failed ({e})")
+                continue
+            if not fr.done(task.key, row):
+                print(f"[{fr.worker_id}] {p['Company']}: lease expired, result discarded")
+                continue
+            print(f"[{fr.worker_id}] #{n} {p['Company']}: email={row['Email']} phone={row['Phone']}")
+        print(f"[{fr.worker_id}] queue drained | {fr.stats()}")
+
+def export_frontier(db):
+    with Frontier(db) as fr:
+        save([row for _, row in fr.results()])
+        for key, attempts, error in fr.failures():
+            print(f"[failed] {key} after {attempts} attempts: {error}")
+
+def main(fetchers=FETCHERS, parsers=PARSERS):
+    df = pd.read_csv(SEED_CSV)
+    companies = df.reindex(columns=["Company", "Website", "Wikipedia"]).to_dict("records")
+    rows = []
+    results = run_pipeline(companies, fetch_stage, parse_stage, fetchers=fetchers, parsers=parsers)
+    for i, (company, row, err) in enumerate(results, start=1):
+        name = company["Company"]
+        if err is not None:
+            print(f"[{i}/{len(df)}] {name}: failed ({err})")
+            row = {**company, "Contact_URL": None, "Email": None, "Phone": None, "Address": None}
+        rows.append(row)
+        print(f"[{i}/{len(df)}] {name}: email={row['Email']} phone={row['Phone']}")
+
+    save(rows)
+
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Enrich seed companies with contact details.")
+    ap.add_argument("--frontier", type=Path, help="SQLite queue file; enables multi-worker mode")
+    ap.add_argument("--seed", action="store_true", help="load SEED_CSV into the frontier")
+    ap.add_argument("--work", action="store_true", help="process tasks until the frontier is drained")
+    ap.add_argument("--export", action="store_true", help="write finished rows to OUT_CSV")
+    ap.add_argument("--fetchers", type=int, default=FETCHERS, help="concurrent fetch threads")
+    ap.add_argument("--parsers", type=int, default=PARSERS, help="parse processes (0 = parse on fetch threads)")
+    args = ap.parse_args()
+
+    if not args.frontier:
+        main(fetchers=args.fetchers, parsers=args.parsers)
+    else:
+        if args.seed:
+            seed_frontier(args.frontier)
+        if args.work:
+            run_worker(args.frontier)
+        if args.export:
+            export_frontier(args.frontier)
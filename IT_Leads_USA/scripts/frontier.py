@@ -0,0 +1,202 @@
+"""
+Durable SQLite work queue ("crawl frontier") shared by scraper workers.
+
+- One row per unique key (URL, bar number, company name...), so re-seeding is a no-op.
+- Workers lease tasks for LEASE_SECONDS; a killed worker's leases simply expire
+  and go back to 'pending' on the next lease() call (counted as an attempt).
+- Failures are retried until MAX_ATTEMPTS, then parked as 'failed'.
+- done()/fail() only apply while the caller still holds the lease, so a slow
+  worker whose lease ran out cannot clobber the task's new owner.
+
+Any number of processes can point at the same .db file (WAL mode + BEGIN IMMEDIATE).
+For several hosts, put the file on a shared disk that supports POSIX locks.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    key         TEXT    NOT NULL UNIQUE,
+    payload     TEXT,
+    priority    INTEGER NOT NULL DEFAULT 0,
+    status      TEXT    NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    result      TEXT,
+    error       TEXT,
+    updated_at  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_pick  ON tasks (status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (status, lease_until);
+"""
+
+
+@dataclass
+class Task:
+    key: str
+    payload: Any
+    attempts: int
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Frontier:
+    def __init__(self, path: Path | str, lease_seconds: float = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS, worker_id: str | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or default_worker_id()
+
+        # isolation_level=None -> we control transactions explicitly
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- seeding ----------
+    def add(self, key: str, payload: Any = None, priority: int = 0) -> bool:
+        """Queue one task; returns False if the key was already known."""
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO tasks (key, payload, priority, updated_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(payload), priority, time.time()),
+        )
+        return cur.rowcount == 1
+
+    def add_many(self, items: Iterable[tuple[str, Any, int]]) -> int:
+        """Bulk version of add() for (key, payload, priority) tuples; returns rows inserted."""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (key, payload, priority, updated_at) VALUES (?, ?, ?, ?)",
+                ((k, json.dumps(p), prio, now) for k, p, prio in items),
+            )
+            inserted = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return inserted
+
+    # ---------- leasing ----------
+    def lease(self, n: int = 1) -> list[Task]:
+        """
+        Claim up to n pending tasks (highest priority first) for this worker.
+        Expired leases from dead workers are returned to the queue first; an
+        expiry counts as a failed attempt, so a task that keeps killing or hanging
+        its worker ends up 'failed' instead of cycling forever.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET attempts=attempts+1, error='lease expired', "
+                "lease_owner=NULL, lease_until=NULL, "
+                "status=CASE WHEN attempts+1 >= ? THEN ? ELSE ? END, updated_at=? "
+                "WHERE status=? AND lease_until < ?",
+                (self.max_attempts, FAILED, PENDING, now, LEASED, now),
+            )
+            rows = self.conn.execute(
+                "SELECT id, key, payload, attempts FROM tasks WHERE status=? "
+                "ORDER BY priority DESC, id LIMIT ?",
+                (PENDING, n),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE tasks SET status=?, lease_owner=?, lease_until=?, updated_at=? WHERE id=?",
+                [(LEASED, self.worker_id, now + self.lease_seconds, now, r[0]) for r in rows],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [Task(key=r[1], payload=json.loads(r[2]), attempts=r[3]) for r in rows]
+
+    def extend(self, key: str) -> bool:
+        """Renew our lease on a long-running task; False if it was lost meanwhile."""
+        now = time.time()
+        cur = self.conn.execute(
+            "UPDATE tasks SET lease_until=?, updated_at=? WHERE key=? AND status=? AND lease_owner=?",
+            (now + self.lease_seconds, now, key, LEASED, self.worker_id),
+        )
+        return cur.rowcount == 1
+
+    def done(self, key: str, result: Any = None) -> bool:
+        """Store the result; False if our lease had expired and the task moved on without us."""
+        cur = self.conn.execute(
+            "UPDATE tasks SET status=?, result=?, error=NULL, lease_owner=NULL, lease_until=NULL, "
+            "updated_at=? WHERE key=? AND status=? AND lease_owner=?",
+            (DONE, json.dumps(result), time.time(), key, LEASED, self.worker_id),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, key: str, error: str = "") -> bool:
+        """
+        Count a failed attempt; requeue until max_attempts, then mark 'failed'.
+        False (and nothing changed) if we no longer hold the lease.
+        """
+        cur = self.conn.execute(
+            "UPDATE tasks SET attempts=attempts+1, error=?, lease_owner=NULL, lease_until=NULL, "
+            "status=CASE WHEN attempts+1 >= ? THEN ? ELSE ? END, updated_at=? "
+            "WHERE key=? AND status=? AND lease_owner=?",
+            (error[:500], self.max_attempts, FAILED, PENDING, time.time(), key, LEASED, self.worker_id),
+        )
+        return cur.rowcount == 1
+
+    def iter_tasks(self, batch: int = 1, idle_sleep: float = 2.0) -> Iterator[Task]:
+        """
+        Yield leased tasks until the queue is drained.
+        Waits (instead of exiting) while other workers still hold live leases,
+        since those come back if the worker dies.
+        """
+        while True:
+            tasks = self.lease(batch)
+            if tasks:
+                yield from tasks
+                continue
+            if not self.stats().get(LEASED):
+                return
+            time.sleep(idle_sleep)
+
+    # ---------- reporting ----------
+    def stats(self) -> dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def results(self) -> Iterator[tuple[str, Any]]:
+        """(key, result) for every finished task, in seed order."""
+        for key, result in self.conn.execute(
+            "SELECT key, result FROM tasks WHERE status=? ORDER BY id", (DONE,)
+        ):
+            yield key, json.loads(result)
+
+    def failures(self) -> Iterator[tuple[str, int, str]]:
+        yield from self.conn.execute(
+            "SELECT key, attempts, error FROM tasks WHERE status=? ORDER BY id", (FAILED,)
+        )
@@ -0,0 +1,96 @@
+"""
+Staged fetch -> parse pipeline.
+
+    fetch(item)  runs on a thread pool   (network bound, releases the GIL)
+    parse(raw)   runs on a process pool  (BeautifulSoup / regex, CPU bound)
+
+At most `max_in_flight` items are between "submitted" and "handed back to the
+caller", which bounds the raw HTML held in memory and pauses fetching when the
+parsers or the writer fall behind. Results are yielded in input order.
+
+`parse` must be a module-level function so it can be pickled to the workers.
+parsers=0 parses on the fetch threads instead (handy for debugging).
+
+Kept in sync by hand: IT_Leads_USA/scripts/pipeline.py and
+CA_Bar_Attorneys_USA/src/pipeline.py are identical copies (the projects ship
+separately, with no shared package), so a fix to one must land in both.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+FETCHERS = 4
+PARSERS = os.cpu_count() or 2
+MAX_IN_FLIGHT = 32
+
+
+def run_pipeline(items: Iterable[Any], fetch: Callable[[Any], Any], parse: Callable[[Any], Any],
+                 fetchers: int = FETCHERS, parsers: int = PARSERS,
+                 max_in_flight: int = MAX_IN_FLIGHT) -> Iterator[tuple[Any, Any, Exception | None]]:
+    """
+    Yield (item, parsed, error) in the order of `items`. error is the exception
+    raised by fetch or parse (parsed is then None); a None from fetch skips parsing.
+    """
+    tpool = ThreadPoolExecutor(fetchers, thread_name_prefix="fetch")
+    ppool = ProcessPoolExecutor(parsers) if parsers > 0 else None
+
+    def submit(item) -> Future:
+        out: Future = Future()
+
+        def failed(f: Future) -> bool:
+            # pass cancellation / errors of a stage on to the item's future
+            if f.cancelled():
+                out.cancel()
+                return True
+            err = f.exception()
+            if err is not None:
+                out.set_exception(err)
+                return True
+            return False
+
+        def relay(f: Future):
+            if not failed(f):
+                out.set_result(f.result())
+
+        def on_fetched(f: Future):
+            if failed(f):
+                return
+            raw = f.result()
+            if raw is None:
+                out.set_result(None)
+            elif ppool is None:
+                try:
+                    out.set_result(parse(raw))
+                except Exception as e:
+                    out.set_exception(e)
+            else:
+                try:
+                    ppool.submit(parse, raw).add_done_callback(relay)
+                except RuntimeError as e:   # pool shut down under us (caller stopped early)
+                    out.set_exception(e)
+
+        tpool.submit(fetch, item).add_done_callback(on_fetched)
+        return out
+
+    pending: deque[tuple[Any, Future]] = deque()
+    try:
+        for item in items:
+            pending.append((item, submit(item)))
+            if len(pending) >= max_in_flight:
+                yield _resolve(*pending.popleft())
+        while pending:
+            yield _resolve(*pending.popleft())
+    finally:
+        # caller may stop early (enough rows found): drop whatever is still queued
+        tpool.shutdown(wait=True, cancel_futures=True)
+        if ppool is not None:
+            ppool.shutdown(wait=True, cancel_futures=True)
+
+
+def _resolve(item, fut: Future) -> tuple[Any, Any, Exception | None]:
+    try:
+        return item, fut.result(), None
+    except Exception as e:   # fetch/parse error, or cancelled during shutdown
+        return item, None, e
@@ -0,0 +1,110 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from frontier import DONE, FAILED, LEASED, PENDING, Frontier  # noqa: E402
+
+EXPIRED = -1  # lease_seconds that makes every lease stale on the next lease() call
+
+
+def status(fr: Frontier, key: str) -> tuple[str, int, str | None]:
+    return fr.conn.execute("SELECT status, attempts, lease_owner FROM tasks WHERE key=?", (key,)).fetchone()
+
+
+def test_add_is_idempotent(tmp_path):
+    with Frontier(tmp_path / "q.db") as fr:
+        assert fr.add("a", {"n": 1})
+        assert not fr.add("a", {"n": 2})
+        assert fr.add_many([("a", None, 0), ("b", None, 0), ("c", None, 0)]) == 2
+        assert fr.stats() == {PENDING: 3}
+
+
+def test_lease_hands_each_task_to_one_worker(tmp_path):
+    db = tmp_path / "q.db"
+    with Frontier(db, worker_id="A") as a, Frontier(db, worker_id="B") as b:
+        a.add_many((f"k{i}", None, 0) for i in range(10))
+        got_a = {t.key for t in a.lease(6)}
+        got_b = {t.key for t in b.lease(6)}
+        assert len(got_a) == 6 and len(got_b) == 4
+        assert not got_a & got_b
+        assert a.lease(1) == []
+
+
+def test_lease_respects_priority(tmp_path):
+    with Frontier(tmp_path / "q.db") as fr:
+        fr.add_many([("low", None, 0), ("high", None, 5)])
+        assert [t.key for t in fr.lease(2)] == ["high", "low"]
+
+
+def test_done_and_fail_need_the_lease(tmp_path):
+    db = tmp_path / "q.db"
+    with Frontier(db, lease_seconds=EXPIRED, worker_id="A") as a, Frontier(db, worker_id="B") as b:
+        a.add("k")
+        [task] = a.lease()
+        # A's lease runs out and B picks the task up
+        assert [t.key for t in b.lease()] == ["k"]
+        assert status(b, "k") == (LEASED, 1, "B")
+
+        assert a.done(task.key, {"by": "A"}) is False
+        assert a.fail(task.key, "late") is False
+        assert not a.extend(task.key)
+        assert status(b, "k") == (LEASED, 1, "B")
+
+        assert b.done("k", {"by": "B"}) is True
+        assert list(b.results()) == [("k", {"by": "B"})]
+        # finished tasks can't be touched again, not even by the last owner
+        assert b.done("k", {"by": "B again"}) is False
+        assert b.fail("k") is False
+
+
+def test_fail_retries_until_max_attempts(tmp_path):
+    with Frontier(tmp_path / "q.db", max_attempts=3) as fr:
+        fr.add("k")
+        for attempt in (1, 2):
+            [task] = fr.lease()
+            assert fr.fail(task.key, "boom")
+            assert status(fr, "k")[:2] == (PENDING, attempt)
+        [task] = fr.lease()
+        assert fr.fail(task.key, "boom")
+        assert status(fr, "k")[:2] == (FAILED, 3)
+        assert fr.lease() == []
+        assert list(fr.failures()) == [("k", 3, "boom")]
+
+
+def test_lease_expiry_counts_as_an_attempt(tmp_path):
+    with Frontier(tmp_path / "q.db", lease_seconds=EXPIRED, max_attempts=3) as fr:
+        fr.add("k")
+        assert fr.lease()[0].attempts == 0
+        assert fr.lease()[0].attempts == 1   # first expiry requeued it
+        assert fr.lease()[0].attempts == 2
+        assert fr.lease() == []               # third expiry parks it
+        assert status(fr, "k") == (FAILED, 3, None)
+        assert list(fr.failures()) == [("k", 3, "lease expired")]
+
+
+def _drain(db: str, worker_id: str) -> list[str]:
+    keys = []
+    with Frontier(db, worker_id=worker_id) as fr:
+        for task in fr.iter_tasks(batch=5, idle_sleep=0.05):
+            keys.append(task.key)
+            assert fr.done(task.key, worker_id)
+    return keys
+
+
+def test_workers_in_parallel_never_share_a_task(tmp_path):
+    db = str(tmp_path / "q.db")
+    with Frontier(db) as fr:
+        fr.add_many((f"k{i}", None, 0) for i in range(400))
+
+    with ProcessPoolExecutor(4) as pool:
+        per_worker = list(pool.map(_drain, [db] * 4, [f"w{i}" for i in range(4)]))
+
+    leased = [k for keys in per_worker for k in keys]
+    assert len(leased) == len(set(leased)) == 400
+    with Frontier(db) as fr:
+        assert fr.stats() == {DONE: 400}
+        # each result was written by the worker that leased it
+        owner = {k: w for w, keys in zip(range(4), per_worker) for k in keys}
+        assert all(r == f"w{owner[k]}" for k, r in fr.results())